@@ -1,6 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+def kahan_add(total, increment, compensation):
+    """Add increment to total with Kahan compensated summation. Returns the new total and compensation."""
+    y = increment - compensation
+    new_total = total + y
+    return new_total, (new_total - total) - y
+
+def decay_increment(N, tau, dt):
+    """Change of N over one Euler step of dN/dt = -N / tau."""
+    return -(N / tau) * dt
+
 # Variables
 dt = 0.4       # Time step
 tmax = 10      # Maximum time
@@ -8,6 +18,13 @@ tau = 2.0      # Decay constant
 t0 = 0         # Start time
 N0 = 10        # Initial quantity
 
+# Precision: 'float64' (reference), 'float32', or 'float32_kahan' for float32 with compensated N and t updates
+precision = 'float64'
+if precision not in ('float64', 'float32', 'float32_kahan'):
+    raise ValueError(f"unknown precision {precision!r}")
+dtype = np.float64 if precision == 'float64' else np.float32
+dt, tau = dtype(dt), dtype(tau)
+
 # Arrays to store calculated N and t values for Euler's method
 t_values = [t0]
 N_values = [N0]
@@ -17,21 +34,27 @@ N_exact_values = [N0]
 error_values = []
 
 # Start loop for Euler's method
-t = t0
-N = N0
+t = dtype(t0)
+N = dtype(N0)
+cN = ct = dtype(0)  # Compensations for the Kahan updates
 while abs(t - tmax) >= dt / 2:
-    # Euler's method to calculate new N value
-    N = N - (N / tau) * dt
+    if precision == 'float32_kahan':
+        # Euler's method and time update with compensated summation
+        N, cN = kahan_add(N, decay_increment(N, tau, dt), cN)
+        t, ct = kahan_add(t, dt, ct)
+    else:
+        # Euler's method to calculate new N value
+        N = N + decay_increment(N, tau, dt)
 
-    # Update time
-    t = t + dt
+        # Update time
+        t = t + dt
 
     # Append to Euler's method arrays
     t_values.append(t)
     N_values.append(N)
 
     # Append exact solution values
-    N_exact = N0 * np.exp(-t / tau)
+    N_exact = N0 * np.exp(-float(t) / float(tau))  # Exact value always in float64
     N_exact_values.append(N_exact)
 
     # Calculate and store the difference (error) between exact and Euler's method
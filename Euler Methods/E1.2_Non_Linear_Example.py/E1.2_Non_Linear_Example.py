@@ -6,28 +6,71 @@ def f(x, t):
     """Define the differential equation function."""
     return t - x**2
 
-def euler_method(x0, h, tmax):
-    """Implement the Euler method for solving the differential equation."""
-    t_values = np.arange(0, tmax + h, h)  # Time values from 0 to tmax
-    x_values = np.zeros(len(t_values))     # Array to store x values
-    x_values[0] = x0                        # Set the initial condition
+def kahan_add(total, increment, compensation):
+    """Add increment to total with Kahan compensated summation. Returns the new total and compensation."""
+    y = increment - compensation
+    new_total = total + y
+    return new_total, (new_total - total) - y
+
+class EulerSolution:
+    """Euler solution for one initial condition that can be extended to a later tmax.
+    precision is 'float64' (reference), 'float32', or 'float32_kahan' for float32 with compensated updates."""
+
+    def __init__(self, x0, h, precision='float64'):
+        if precision not in ('float64', 'float32', 'float32_kahan'):
+            raise ValueError(f"unknown precision {precision!r}")
+        self.dtype = np.float64 if precision == 'float64' else np.float32
+        self.compensated = precision == 'float32_kahan'
+        self.h = self.dtype(h)                     # Step size
+        self.t_values = np.zeros(1, dtype=self.dtype)  # Time values solved so far
+        self.x_values = np.array([x0], dtype=self.dtype)  # x values solved so far
+        self.compensation = self.dtype(0)          # Rounding error carried to the next compensated update
+
+    def extend(self, tmax):
+        """Continue Euler's method from the last solved step up to tmax, giving the same values as one long run."""
+        n_total = len(np.arange(0, tmax + self.h, self.h))  # Same number of steps as euler_method
+        n_solved = len(self.t_values)
+        if n_total <= n_solved:
+            return self
 
-    # Apply Euler's method
-    for n in range(1, len(t_values)):
-        t = t_values[n - 1]
-        x = x_values[n - 1]
-        x_values[n] = x + h * f(x, t)      # Update x using the Euler method
+        # Same time values as np.arange(0, tmax + h, h), each rounded once rather than accumulated
+        self.t_values = (np.arange(n_total) * np.float64(self.h)).astype(self.dtype)
+        x_values = np.zeros(n_total, dtype=self.dtype)
+        x_values[:n_solved] = self.x_values
+        for n in range(n_solved, n_total):
+            t = self.t_values[n - 1]
+            x = x_values[n - 1]
+            if self.compensated:
+                x_values[n], self.compensation = kahan_add(x, self.h * f(x, t), self.compensation)
+            else:
+                x_values[n] = x + self.h * f(x, t)  # Update x using the Euler method
+        self.x_values = x_values
+        return self
 
-    return t_values, x_values
+    def up_to(self, tmax):
+        """Return the time and x values from 0 to tmax, extending the solution if needed."""
+        self.extend(tmax)
+        n = len(np.arange(0, tmax + self.h, self.h))
+        return self.t_values[:n], self.x_values[:n]
 
-def plot_results(initial_conditions, h, tmax):
-    """Plot results for different initial conditions and the curve x = sqrt(t)."""
+def euler_method(x0, h, tmax, precision='float64'):
+    """Implement the Euler method for solving the differential equation."""
+    return EulerSolution(x0, h, precision).up_to(tmax)
+
+def plot_results(initial_conditions, h, tmax, solutions=None):
+    """Plot results for different initial conditions and the curve x = sqrt(t).
+    solutions maps (x0, h) to an EulerSolution, so a longer tmax only solves the new steps;
+    without it every solution starts from t = 0."""
+    if solutions is None:
+        solutions = {}
     plt.figure(figsize=(12, 8))
     t_values = np.arange(0, tmax + h, h)  # Time values for the curve x = sqrt(t)
 
     # Plot each initial condition's result
     for x0 in initial_conditions:
-        t_values, x_values = euler_method(x0, h, tmax)
+        if (x0, h) not in solutions:
+            solutions[(x0, h)] = EulerSolution(x0, h)
+        t_values, x_values = solutions[(x0, h)].up_to(tmax)
         plt.plot(t_values, x_values, label=f'x0 = {x0}')
 
     # Plot the theoretical line x = sqrt(t)
@@ -51,6 +94,8 @@ def plot_results(initial_conditions, h, tmax):
     plt.show()
 
 
+solutions = {}  # Solutions kept between plots, keyed by (x0, h)
+
 # Parameters
 h = 0.5                                                    # Step size
 tmax_values = [15, 30]                                # Different maximum times
@@ -58,7 +103,7 @@ initial_conditions = [4, 2, 1, 0, -0.7, -0.73, -1.5, -2]  # More initial values
 
 # Plot and save results for different tmax values
 for tmax in tmax_values:
-    plot_results(initial_conditions, h, tmax)
+    plot_results(initial_conditions, h, tmax, solutions)
 
 # Parameters for second graph
 
@@ -68,4 +113,4 @@ initial_conditions = [4, 2, 1, 0, -0.7, -0.73, -1.5, -2]  # More initial values
 
 # Plot and save results for different tmax values
 for tmax in tmax_values:
-    plot_results(initial_conditions, h, tmax)
+    plot_results(initial_conditions, h, tmax, solutions)
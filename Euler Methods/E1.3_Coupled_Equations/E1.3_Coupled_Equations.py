@@ -11,13 +11,25 @@ def dydt(x):
     """Returns the derivative dy/dt = -x."""
     return -x
 
-def euler_method_coupled(x0, y0, h, tmax):
-    """Solves the coupled differential equations using Euler's method."""
-    t_values = np.arange(0, tmax + h, h)  # Time values
-    x_values = np.zeros(len(t_values))     # Array to store x values
-    y_values = np.zeros(len(t_values))     # Array to store y values
+def kahan_add(total, increment, compensation):
+    """Add increment to total with Kahan compensated summation. Returns the new total and compensation."""
+    y = increment - compensation
+    new_total = total + y
+    return new_total, (new_total - total) - y
+
+def euler_method_coupled(x0, y0, h, tmax, precision='float64'):
+    """Solves the coupled differential equations using Euler's method.
+    precision is 'float64' (reference), 'float32', or 'float32_kahan' for float32 with compensated updates."""
+    if precision not in ('float64', 'float32', 'float32_kahan'):
+        raise ValueError(f"unknown precision {precision!r}")
+    dtype = np.float64 if precision == 'float64' else np.float32
+    t_values = np.arange(0, tmax + h, h).astype(dtype)  # Time values
+    x_values = np.zeros(len(t_values), dtype=dtype)  # Array to store x values
+    y_values = np.zeros(len(t_values), dtype=dtype)  # Array to store y values
     x_values[0] = x0                       # Initial condition for x
     y_values[0] = y0                       # Initial condition for y
+    h = dtype(h)
+    cx = cy = dtype(0)                     # Compensations for the Kahan updates
 
     # Apply Euler's method
     for n in range(1, len(t_values)):
@@ -28,8 +40,12 @@ def euler_method_coupled(x0, y0, h, tmax):
         dy = dydt(x)                       # Compute dy/dt
 
         # Update x and y using Euler's method
-        x_values[n] = x + h * dx
-        y_values[n] = y + h * dy
+        if precision == 'float32_kahan':
+            x_values[n], cx = kahan_add(x, h * dx, cx)
+            y_values[n], cy = kahan_add(y, h * dy, cy)
+        else:
+            x_values[n] = x + h * dx
+            y_values[n] = y + h * dy
 
     return t_values, x_values, y_values
 
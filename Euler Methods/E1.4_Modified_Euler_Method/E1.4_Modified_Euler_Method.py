@@ -9,12 +9,25 @@ def exact_solution(t_values):
     v_exact = np.cos(t_values)
     return x_exact, v_exact
 
+def kahan_add(total, increment, compensation):
+    """Add increment to total with Kahan compensated summation. Returns the new total and compensation."""
+    y = increment - compensation
+    new_total = total + y
+    return new_total, (new_total - total) - y
+
 # Define the modified Euler method (Heun's Method)
-def modified_euler_method(x0, v0, h, tmax):
-    """Solve the simple harmonic oscillator using the Modified Euler method."""
-    t_values = np.arange(0, tmax + h, h)  # Time values
-    x_values = np.zeros(len(t_values))     # Array to store position values (x)
-    v_values = np.zeros(len(t_values))     # Array to store velocity values (v)
+def modified_euler_method(x0, v0, h, tmax, precision='float64'):
+    """Solve the simple harmonic oscillator using the Modified Euler method.
+    precision is 'float64' (reference), 'float32', or 'float32_kahan' for float32 with compensated updates."""
+    if precision not in ('float64', 'float32', 'float32_kahan'):
+        raise ValueError(f"unknown precision {precision!r}")
+    dtype = np.float64 if precision == 'float64' else np.float32
+    t_values = np.arange(0, tmax + h, h).astype(dtype)  # Time values
+    x_values = np.zeros(len(t_values), dtype=dtype)  # Array to store position values (x)
+    v_values = np.zeros(len(t_values), dtype=dtype)  # Array to store velocity values (v)
+    h = dtype(h)
+    half = dtype(0.5)
+    cx = cv = dtype(0)  # Compensations for the Kahan updates
 
     # Initial conditions
     x_values[0] = x0
@@ -27,8 +40,12 @@ def modified_euler_method(x0, v0, h, tmax):
         vinit = v_values[i-1] - h * x_values[i-1]
 
         # Corrected estimates for position and velocity
-        x_values[i] = x_values[i-1] + 0.5 * h * (v_values[i-1] + vinit)
-        v_values[i] = v_values[i-1] - 0.5 * h * (x_values[i-1] + xinit)
+        if precision == 'float32_kahan':
+            x_values[i], cx = kahan_add(x_values[i-1], half * h * (v_values[i-1] + vinit), cx)
+            v_values[i], cv = kahan_add(v_values[i-1], -(half * h * (x_values[i-1] + xinit)), cv)
+        else:
+            x_values[i] = x_values[i-1] + half * h * (v_values[i-1] + vinit)
+            v_values[i] = v_values[i-1] - half * h * (x_values[i-1] + xinit)
 
     return t_values, x_values, v_values
 
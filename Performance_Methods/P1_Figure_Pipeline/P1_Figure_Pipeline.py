@@ -0,0 +1,322 @@
+import os
+import time
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Headless backend, safe to use inside worker processes
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from google.colab import files
+
+# Figures kept alive between renders in each process, keyed by figure size
+_TEMPLATES = {}
+
+
+def lttb(x, y, n_out):
+    """
+    Downsamples a curve with the Largest-Triangle-Three-Buckets algorithm.
+    The first and last points are always kept, and the interior points are split into equal buckets.
+    From every bucket the point forming the largest triangle with the averages of the neighbouring
+    buckets is kept, so peaks and turning points survive. Using the previous bucket's average
+    instead of its selected point lets every bucket be handled at once with array operations.
+    :param x: array of monotonically increasing x values (e.g. time)
+    :param y: array of y values
+    :param n_out: number of points to keep
+    :return: x and y arrays with at most n_out points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    # Equal buckets of the interior points, the last one padded by repeating the last interior point
+    size = -(-(n - 2) // (n_out - 2))
+    buckets = -(-(n - 2) // size)
+    index = np.minimum(np.arange(1, 1 + buckets * size), n - 2).reshape(buckets, size)
+    bx, by = x[index], y[index]
+
+    # Average point of every bucket, counting the padding only once
+    counts = np.full(buckets, size)
+    counts[-1] = n - 2 - (buckets - 1) * size
+    real = np.arange(size) < counts[:, None]
+    avg_x = (bx * real).sum(axis=1) / counts
+    avg_y = (by * real).sum(axis=1) / counts
+
+    # Neighbours of each bucket: the previous and next averages, or the end points
+    prev_x, prev_y = np.append(x[0], avg_x[:-1]), np.append(y[0], avg_y[:-1])
+    next_x, next_y = np.append(avg_x[1:], x[-1]), np.append(avg_y[1:], y[-1])
+
+    # Triangle areas (times two) between the neighbours and every candidate
+    area = np.abs((prev_x - next_x)[:, None] * (by - prev_y[:, None])
+                  - (prev_x[:, None] - bx) * (next_y - prev_y)[:, None])
+    keep = np.concatenate([[0], index[np.arange(buckets), area.argmax(axis=1)], [n - 1]])
+    return x[keep], y[keep]
+
+
+def decimate_spec(spec, max_points):
+    """
+    Returns a copy of a figure spec with every long line reduced to max_points using LTTB.
+    :param spec: figure spec dictionary (see render_figure)
+    :param max_points: maximum number of points per line, None to keep every point
+    :return: the decimated figure spec
+    """
+    if max_points is None:
+        return spec
+    lines = []
+    for line in spec['lines']:
+        if line.get('decimate', True):
+            x, y = lttb(line['x'], line['y'], max_points)
+            line = dict(line, x=x, y=y)
+        lines.append(line)
+    return dict(spec, lines=lines)
+
+
+def _template(figsize):
+    """
+    Returns a cleared figure and axes of the given size, creating it only on first use.
+    :param figsize: tuple with the figure size in inches
+    :return: fig, ax
+    """
+    if figsize not in _TEMPLATES:
+        _TEMPLATES[figsize] = plt.subplots(figsize=figsize)
+    fig, ax = _TEMPLATES[figsize]
+
+    # Remove everything the previous figure drew, but keep the figure, axes and ticks
+    for artist in ax.lines[:] + ax.collections[:]:
+        artist.remove()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.set_prop_cycle(None)  # Restart the colour cycle
+    ax.set_autoscale_on(True)
+    return fig, ax
+
+
+def render_figure(spec, formats=('png',), dpi=300, rasterized=False):
+    """
+    Draws a single figure from its spec on a reused template and saves it.
+    A spec is a dictionary with the keys
+        'filename': output name, the extension is replaced by each format
+        'lines': list of dictionaries with 'x', 'y' and optional 'fmt', 'kwargs', 'decimate'
+    and the optional keys 'figsize', 'title', 'xlabel', 'ylabel', 'xlim', 'ylim',
+    'hlines' and 'vlines' (lists of positions for black reference lines) and 'legend'.
+    :param spec: figure spec dictionary
+    :param formats: output formats, e.g. ('png',) for raster or ('svg', 'pdf') for vector output
+    :param dpi: resolution used for raster formats
+    :param rasterized: rasterize the data lines inside vector formats to keep the files small
+    :return: list of the saved filenames
+    """
+    fig, ax = _template(tuple(spec.get('figsize', (12, 8))))
+
+    for line in spec['lines']:
+        artists = ax.plot(line['x'], line['y'], line.get('fmt', ''), **line.get('kwargs', {}))
+        for artist in artists:
+            artist.set_rasterized(rasterized)
+    for y in spec.get('hlines', []):
+        ax.axhline(y, color='black', lw=0.5, ls='--')  # Horizontal reference line
+    for x in spec.get('vlines', []):
+        ax.axvline(x, color='black', lw=0.5, ls='--')  # Vertical reference line
+
+    # Graph formatting
+    ax.set_title(spec.get('title', ''))
+    ax.set_xlabel(spec.get('xlabel', ''))
+    ax.set_ylabel(spec.get('ylabel', ''))
+    ax.relim()
+    ax.autoscale_view()
+    if 'xlim' in spec:
+        ax.set_xlim(*spec['xlim'])
+    if 'ylim' in spec:
+        ax.set_ylim(*spec['ylim'])
+    if spec.get('legend', True):
+        ax.legend()
+
+    stem = os.path.splitext(spec['filename'])[0]
+    filenames = []
+    for fmt in formats:
+        filename = f'{stem}.{fmt}'
+        fig.savefig(filename, dpi=dpi, format=fmt)
+        filenames.append(filename)
+    return filenames
+
+
+def render_figure_original(spec, dpi=300):
+    """
+    Draws a figure the way the original experiment scripts do, on a new figure for every plot with
+    every point of every line. Kept as the baseline the pipeline is timed against.
+    :param spec: figure spec dictionary (see render_figure)
+    :param dpi: resolution of the saved png
+    :return: the saved filename
+    """
+    plt.figure(figsize=spec.get('figsize', (12, 8)))
+    for line in spec['lines']:
+        plt.plot(line['x'], line['y'], line.get('fmt', ''), **line.get('kwargs', {}))
+    for y in spec.get('hlines', []):
+        plt.axhline(y, color='black', lw=0.5, ls='--')
+    for x in spec.get('vlines', []):
+        plt.axvline(x, color='black', lw=0.5, ls='--')
+
+    plt.title(spec.get('title', ''))
+    plt.xlabel(spec.get('xlabel', ''))
+    plt.ylabel(spec.get('ylabel', ''))
+    if spec.get('legend', True):
+        plt.legend()
+    if 'xlim' in spec:
+        plt.xlim(*spec['xlim'])
+    if 'ylim' in spec:
+        plt.ylim(*spec['ylim'])
+
+    filename = spec['filename']
+    plt.savefig(filename, dpi=dpi)
+    plt.close()  # plt.show() closes the figure in the notebooks
+    return filename
+
+
+def _render_batch(specs, formats, dpi, rasterized):
+    """
+    Renders several specs in one worker so that its templates are reused between them.
+    """
+    return [render_figure(spec, formats, dpi, rasterized) for spec in specs]
+
+
+def render_figures(specs, workers=None, formats=('png',), dpi=300, max_points=2000, rasterized=False):
+    """
+    Decimates and renders a list of figure specs in parallel worker processes.
+    :param specs: list of figure spec dictionaries (see render_figure)
+    :param workers: number of worker processes, None for one per CPU and 1 to render in this process
+    :param formats: output formats, e.g. ('png',) or ('svg', 'pdf')
+    :param dpi: resolution used for raster formats
+    :param max_points: maximum number of points drawn per line, None to disable decimation
+    :param rasterized: rasterize the data lines inside vector formats
+    :return: list of all saved filenames, in the order of the specs
+    """
+    # Decimate before handing the specs to the workers so less data has to be copied
+    specs = [decimate_spec(spec, max_points) for spec in specs]
+    workers = min(workers or os.cpu_count() or 1, len(specs))
+
+    if workers <= 1:
+        rendered = _render_batch(specs, formats, dpi, rasterized)
+    else:
+        # Interleave the specs so that each worker gets a similar share of the work
+        rendered = [None] * len(specs)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_batch, specs[i::workers], formats, dpi, rasterized)
+                       for i in range(workers)]
+            for i, future in enumerate(futures):
+                rendered[i::workers] = future.result()
+
+    return [filename for result in rendered for filename in result]
+
+
+def f(x, t):
+    """Define the differential equation function of experiment E1.2."""
+    return t - x**2
+
+
+def euler_method(x0, h, tmax):
+    """Implement the Euler method for solving the differential equation of experiment E1.2."""
+    t_values = np.arange(0, tmax + h, h)  # Time values from 0 to tmax
+    x_values = np.zeros(len(t_values))     # Array to store x values
+    x_values[0] = x0                        # Set the initial condition
+
+    # Apply Euler's method
+    for n in range(1, len(t_values)):
+        x_values[n] = x_values[n - 1] + h * f(x_values[n - 1], t_values[n - 1])
+
+    return t_values, x_values
+
+
+def modified_euler_method(x0, v0, h, tmax):
+    """Solve the simple harmonic oscillator of experiment E1.4 using the Modified Euler method."""
+    t_values = np.arange(0, tmax + h, h)  # Time values
+    x_values = np.zeros(len(t_values))     # Array to store position values (x)
+    v_values = np.zeros(len(t_values))     # Array to store velocity values (v)
+    x_values[0] = x0
+    v_values[0] = v0
+
+    # Modified Euler Method loop
+    for i in range(1, len(t_values)):
+        xinit = x_values[i-1] + h * v_values[i-1]
+        vinit = v_values[i-1] - h * x_values[i-1]
+        x_values[i] = x_values[i-1] + 0.5 * h * (v_values[i-1] + vinit)
+        v_values[i] = v_values[i-1] - 0.5 * h * (x_values[i-1] + xinit)
+
+    return t_values, x_values, v_values
+
+
+def non_linear_specs(initial_conditions, h, tmax_values):
+    """
+    Builds the figure specs of experiment E1.2 for each maximum time.
+    """
+    specs = []
+    for tmax in tmax_values:
+        lines = []
+        for x0 in initial_conditions:
+            t_values, x_values = euler_method(x0, h, tmax)
+            lines.append({'x': t_values, 'y': x_values, 'kwargs': {'label': f'x0 = {x0}'}})
+        lines.append({'x': t_values, 'y': np.sqrt(t_values), 'fmt': 'k--',
+                      'kwargs': {'label': 'x = sqrt(t)', 'linewidth': 2}})
+        specs.append({'filename': f'euler_solution_tmax_{tmax}_h_{h}.png',
+                      'lines': lines,
+                      'title': f'Numerical Solution of dx/dt = t - x^2 (tmax = {tmax}), h = {h}',
+                      'xlabel': 'Time (t)', 'ylabel': 'x(t)',
+                      'hlines': [0], 'vlines': [0],
+                      'xlim': (0, tmax), 'ylim': (-3, 7)})
+    return specs
+
+
+def modified_euler_specs(h_values, tmax):
+    """
+    Builds the solution and error figure specs of experiment E1.4.
+    """
+    solution_lines, error_lines = [], []
+    for h in h_values:
+        t_values, x_values, v_values = modified_euler_method(0, 1, h, tmax)
+        solution_lines.append({'x': t_values, 'y': x_values, 'kwargs': {'label': f'Modified Euler h = {h}'}})
+        error_lines.append({'x': t_values, 'y': x_values - np.sin(t_values), 'kwargs': {'label': f'Error for h = {h}'}})
+
+    t_values_exact = np.linspace(0, tmax, 1000)
+    solution_lines.append({'x': t_values_exact, 'y': np.sin(t_values_exact), 'fmt': 'k--',
+                           'kwargs': {'label': 'Exact Solution (sin(t))', 'lw': 2}})
+
+    return [{'filename': 'modified_euler_solutions.png', 'lines': solution_lines,
+             'title': 'Numerical vs Exact Solutions for Different Step Sizes using Modified Euler',
+             'xlabel': 'Time (t)', 'ylabel': 'Position x(t)',
+             'xlim': (0, tmax), 'ylim': (-1.5, 1.5)},
+            {'filename': 'modified_euler_errors.png', 'lines': error_lines,
+             'title': 'Error between Numerical and Exact Solutions for Different Step Sizes using Modified Euler',
+             'xlabel': 'Time (t)', 'ylabel': 'Error in x(t)', 'hlines': [0],
+             'xlim': (0, tmax)}]
+
+
+def main():
+    """
+    Regenerates the figures of experiments E1.2 and E1.4 through the pipeline and compares the
+    time taken by templates, decimation and parallel rendering against the original plotting flow.
+    """
+    initial_conditions = [4, 2, 1, 0, -0.7, -0.73, -1.5, -2]
+    specs = non_linear_specs(initial_conditions, 0.5, [15, 30])
+    specs += non_linear_specs(initial_conditions, 0.25, [15, 50])
+    specs += modified_euler_specs([0.03, 0.015, 0.005, 0.001], 5 * 2 * np.pi)
+
+    # Each optimisation is timed on its own against the original flow, then all of them together
+    start = time.perf_counter()
+    for spec in specs:
+        render_figure_original(spec)
+    original = time.perf_counter() - start
+    print(f"Original flow (new figure per plot, full resolution): {original:.2f} s")
+
+    runs = [('Reused templates, full resolution', {'workers': 1, 'max_points': None}),
+            ('Reused templates, decimated', {'workers': 1, 'max_points': 2000}),
+            (f'Reused templates, decimated, {os.cpu_count()} processes', {'max_points': 2000})]
+    for label, kwargs in runs:
+        start = time.perf_counter()
+        filenames = render_figures(specs, **kwargs)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {elapsed:.2f} s ({original / elapsed:.2f}x)")
+
+    for filename in filenames:
+        print(f"Saved plot as {filename}")  # Text confirm
+        files.download(filename)
+
+
+if __name__ == '__main__':
+    main()
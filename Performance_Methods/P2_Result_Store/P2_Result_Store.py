@@ -0,0 +1,282 @@
+import os
+import json
+import shutil
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy import integrate
+from google.colab import files
+
+
+class ResultStore:
+    """
+    Columnar on-disk store for many trajectories sampled on the same number of time points.
+    Every trajectory is one row. The time values and each state component are columns holding
+    an array of length n_t per row, and each parameter is a column holding one float per row.
+    Rows are written in chunks, one file per column and chunk:
+        path/meta.json          column names, dtypes and the number of rows in each chunk
+        path/<column>/<k>.npy   chunk k of a column (memory-mapped when read)
+        path/<column>/<k>.npz   chunk k of a column when compression is on
+    """
+
+    def __init__(self, path):
+        """
+        Opens an existing store.
+        :param path: directory of the store
+        """
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self._pending = {name: [] for name in self.columns}
+
+    @classmethod
+    def create(cls, path, n_t, states, params, chunk_rows=1024, compress=False, float32=False,
+               overwrite=False):
+        """
+        Creates a new, empty store.
+        :param path: directory of the store, must not exist yet unless overwrite is set
+        :param n_t: number of time points in every trajectory
+        :param states: names of the state components, e.g. ['x', 'v']
+        :param params: names of the parameters, e.g. ['a', 'b']
+        :param chunk_rows: number of rows written to each chunk file
+        :param compress: compress the chunk files (reads then decompress one chunk at a time)
+        :param float32: store the time and state columns as float32 to halve their size
+        :param overwrite: delete an existing store at path first (other directories are never deleted)
+        :return: the opened store
+        """
+        if overwrite and os.path.exists(os.path.join(path, 'meta.json')):
+            shutil.rmtree(path)
+        os.makedirs(path)
+        dtype = 'float32' if float32 else 'float64'
+        meta = {'n_t': n_t,
+                'states': list(states),
+                'params': list(params),
+                'dtypes': dict({'t': dtype}, **{name: dtype for name in states},
+                               **{name: 'float64' for name in params}),  # Parameters stay exact for queries
+                'chunk_rows': chunk_rows,
+                'compress': compress,
+                'chunks': []}  # Number of rows in each chunk
+        for name in meta['dtypes']:
+            os.makedirs(os.path.join(path, name))
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        return cls(path)
+
+    @property
+    def columns(self):
+        """Names of all columns: time, the state components and the parameters."""
+        return ['t'] + self.meta['states'] + self.meta['params']
+
+    def __len__(self):
+        """Number of rows written to disk."""
+        return sum(self.meta['chunks'])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def append(self, t, states, params):
+        """
+        Adds trajectories to the store. They reach the disk once a whole chunk is collected or on flush().
+        :param t: array of time values with shape (n_t,) or (rows, n_t)
+        :param states: dictionary mapping each state name to an array with shape (n_t,) or (rows, n_t)
+        :param params: dictionary mapping each parameter name to a float or an array of shape (rows,)
+        """
+        rows = np.atleast_2d(states[self.meta['states'][0]]).shape[0]
+        values = dict(states, t=t, **params)
+        for name in self.columns:
+            shape = (rows,) if name in self.meta['params'] else (rows, self.meta['n_t'])
+            column = np.asarray(values[name], dtype=self.meta['dtypes'][name])
+            self._pending[name].append(np.broadcast_to(column, shape))
+
+        # Write every complete chunk collected so far as slices of one buffer per column, so each
+        # row is copied once however many chunks a single append fills
+        pending = sum(len(c) for c in self._pending['t'])
+        chunk_rows = self.meta['chunk_rows']
+        if pending >= chunk_rows:
+            buffers = {name: np.concatenate(self._pending[name]) for name in self.columns}
+            start = 0
+            while pending - start >= chunk_rows:
+                self._write_chunk({name: buffer[start:start + chunk_rows] for name, buffer in buffers.items()})
+                start += chunk_rows
+            self._pending = {name: [buffer[start:].copy()] for name, buffer in buffers.items()}
+
+    def flush(self):
+        """Writes the rows still waiting in memory as a (possibly shorter) chunk."""
+        if sum(len(c) for c in self._pending['t']):
+            self._write_chunk({name: np.concatenate(self._pending[name]) for name in self.columns})
+            self._pending = {name: [] for name in self.columns}
+
+    def _write_chunk(self, chunk):
+        """
+        Writes the next chunk of every column.
+        :param chunk: dictionary mapping each column name to its rows in the chunk
+        """
+        k = len(self.meta['chunks'])
+        for name in self.columns:
+            filename = os.path.join(self.path, name, f'{k:06d}')
+            if self.meta['compress']:
+                np.savez_compressed(filename + '.npz', data=chunk[name])
+            else:
+                np.save(filename + '.npy', chunk[name])
+
+        # Update the metadata last, so a crash never leaves a chunk listed that was not fully written
+        self.meta['chunks'].append(len(chunk['t']))
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+
+    def chunk(self, name, k):
+        """
+        Reads one chunk of a column. Uncompressed chunks are memory-mapped, so no data is
+        copied until it is used; compressed chunks are decompressed into memory.
+        :param name: column name
+        :param k: chunk index
+        :return: array with shape (rows,) for parameters or (rows, n_t) otherwise
+        """
+        filename = os.path.join(self.path, name, f'{k:06d}')
+        if self.meta['compress']:
+            with np.load(filename + '.npz') as data:
+                return data['data']
+        return np.load(filename + '.npy', mmap_mode='r')
+
+    def column(self, name):
+        """
+        Reads a whole column into memory.
+        :param name: column name
+        :return: array with one entry (or one row of n_t values) per trajectory
+        """
+        return np.concatenate([self.chunk(name, k) for k in range(len(self.meta['chunks']))])
+
+    def _matches(self, k, conditions):
+        """
+        Finds the rows of chunk k that satisfy all conditions (see select).
+        :return: boolean mask over the rows of the chunk
+        """
+        mask = np.ones(self.meta['chunks'][k], dtype=bool)
+        for name, condition in conditions.items():
+            values = self.chunk(name, k)
+            if callable(condition):
+                mask &= condition(values)
+            elif isinstance(condition, tuple):
+                low, high = condition
+                mask &= (values >= low) & (values <= high)
+            else:
+                mask &= np.isclose(values, condition)
+        return mask
+
+    def select(self, columns=None, **conditions):
+        """
+        Reads the trajectories whose parameters satisfy the given conditions. Only the parameter
+        columns named in the conditions are scanned, and the other columns are only read for
+        chunks that contain a match.
+        Each condition is a value (matched with np.isclose), a (low, high) tuple of inclusive
+        bounds, or a function mapping an array of parameter values to a boolean mask.
+        :param columns: names of the columns to return, None for all of them
+        :param conditions: parameter name = condition
+        :return: dictionary mapping each column name to the array of matching rows
+        """
+        columns = self.columns if columns is None else columns
+        selected = {name: [] for name in columns}
+        for k in range(len(self.meta['chunks'])):
+            mask = self._matches(k, conditions)
+            if not mask.any():
+                continue
+            for name in columns:
+                selected[name].append(self.chunk(name, k)[mask])
+
+        result = {}
+        for name in columns:
+            if selected[name]:
+                result[name] = np.concatenate(selected[name])
+            else:
+                shape = (0,) if name in self.meta['params'] else (0, self.meta['n_t'])
+                result[name] = np.empty(shape, dtype=self.meta['dtypes'][name])
+        return result
+
+    def nbytes(self):
+        """Total size of the chunk files on disk in bytes."""
+        return sum(entry.stat().st_size
+                   for name in self.columns
+                   for entry in os.scandir(os.path.join(self.path, name)))
+
+
+def nonlinear1(t, y, a, b):
+    """
+    Calculates the derivative value for the differential equation given in experiment R1, with parameters a and b.
+    :param t: a float for the time variable
+    :param y: a float (or array of floats) for the dependent variable
+    :param a: parameter for the equation
+    :param b: parameter for the equation
+    :return dydt a float for the derivative of the differential equation:
+    """
+    return -a * y**3 + b * np.sin(t)
+
+
+def sweep(store, a_values, b_values, t0, tf, n, y0):
+    """
+    Solves the R1.1 equation for every (a, b) pair of a grid and appends the trajectories to a store.
+    The values of b are solved together as one vectorized system for each value of a.
+    :param store: ResultStore with a state column 'y' and parameter columns 'a' and 'b'
+    :param a_values: values of a
+    :param b_values: values of b
+    :param t0: initial time
+    :param tf: final time
+    :param n: number of time points
+    :param y0: initial condition shared by every trajectory
+    """
+    t = np.linspace(t0, tf, n)
+    b_values = np.asarray(b_values, dtype=float)
+    for a in a_values:
+        result = integrate.solve_ivp(fun=lambda t, y: nonlinear1(t, y, a, b_values),
+                                     t_span=(t0, tf),
+                                     y0=np.full(len(b_values), y0, dtype=float),
+                                     method="RK45",
+                                     t_eval=t)
+        store.append(result.t, {'y': result.y}, {'a': a, 'b': b_values})
+
+
+def main():
+    """
+    Sweeps the (a, b) plane of experiment R1.1 into stores with different options, compares their
+    size on disk, and plots a slice of the sweep queried from the store.
+    """
+    # Define the initial variables
+    t0 = 0  # Initial time
+    tf = 20  # Final time
+    n = 101  # Number of time steps
+    y0 = 0  # Initial state at t = 0
+
+    a_values = np.linspace(0.5, 2, 16)  # Values of a to sweep over
+    b_values = np.linspace(0.5, 3.5, 64)  # Values of b to sweep over
+
+    options = {'float64': {}, 'float32': {'float32': True}, 'float32_compressed': {'float32': True, 'compress': True}}
+    for label, kwargs in options.items():
+        path = f'R1.1_sweep_{label}'
+        with ResultStore.create(path, n, ['y'], ['a', 'b'], chunk_rows=256, overwrite=True,
+                                **kwargs) as store:
+            sweep(store, a_values, b_values, t0, tf, n, y0)
+        print(f"{label}: {len(store)} trajectories, {store.nbytes() / 1024:.0f} KiB on disk")
+
+    # Query a slice of the sweep without loading the rest of it
+    store = ResultStore('R1.1_sweep_float32_compressed')
+    rows = store.select(a=2, b=(0.5, 1.5))
+
+    plt.figure()
+    for t, y, b in zip(rows['t'], rows['y'], rows['b']):
+        plt.plot(t, y, label=f'b={b:.2f}')
+    plt.xlabel('Time (t)')  # Label for x-axis
+    plt.ylabel('y(t)')  # Label for y-axis
+    plt.title('Solutions of the ODE for a = 2 read back from the result store')
+    plt.legend(fontsize='small', ncol=2)
+    filename = 'result_store_slice.png'
+    plt.savefig(filename, dpi=300)
+    print(f"Saved plot as {filename}")  # Text confirm
+    files.download(filename)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,349 @@
+import json
+import time
+import asyncio
+from collections import deque
+import numpy as np
+from scipy import integrate
+
+
+def nonlinear1(t, y, a, b):
+    """
+    Calculates the derivative value for the differential equation of experiment R1.1.
+    :param t: a float for the time variable
+    :param y: array of the dependent variable, one entry per ensemble member
+    :param a: array of the parameter a, one entry per ensemble member
+    :param b: array of the parameter b, one entry per ensemble member
+    :return: array of derivatives
+    """
+    return -a * y**3 + b * np.sin(t)
+
+
+def differential_rl(t, i, v, r, l):
+    """
+    Calculates the rate of change of current in the RL circuit of experiment R1.2:
+    dI/dt = (V - RI) / L
+    Every argument except t is an array with one entry per ensemble member.
+    """
+    return (v - r * i) / l
+
+
+# Right hand sides the service can solve, with the names of their parameters in call order
+MODELS = {'nonlinear1': (nonlinear1, ['a', 'b']),
+          'rl_circuit': (differential_rl, ['v', 'r', 'l'])}
+
+
+def solve_ensemble(model, params, y0, t0, tf, n, rtol=1e-6, atol=1e-9):
+    """
+    Solves many copies of one model with different parameters and initial conditions as a single
+    vectorized system. The step size is shared by every member and the error is controlled on the
+    RMS norm over the whole ensemble, so the tolerances are tighter than the solve_ivp defaults.
+    :param model: name of the model in MODELS
+    :param params: dictionary mapping each parameter name to an array with one entry per member
+    :param y0: array of initial conditions, one entry per member
+    :param t0: initial time
+    :param tf: final time
+    :param n: number of time points to report
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :return: t (time points), y (array of solutions with one row per member)
+    """
+    fun, names = MODELS[model]
+    args = [np.asarray(params[name], dtype=float) for name in names]
+    t = np.linspace(t0, tf, n)
+    result = integrate.solve_ivp(fun=lambda t, y: fun(t, y, *args),
+                                 t_span=(t0, tf),
+                                 y0=np.asarray(y0, dtype=float),
+                                 method="RK45",
+                                 t_eval=t,
+                                 rtol=rtol,
+                                 atol=atol)
+    if not result.success:
+        raise RuntimeError(result.message)
+    return result.t, result.y
+
+
+def solve_members(model, params, y0, t0, tf, n, rtol=1e-6, atol=1e-9):
+    """
+    Solves an ensemble like solve_ensemble, but when the ensemble solve fails it splits the members
+    in halves and solves each half again, so only the members that fail on their own get an error.
+    A diverging member costs about 2 log2(members) extra solves instead of failing every member.
+    :return: t (time points), list with the solution row or the error message of every member
+    """
+    try:
+        t, y = solve_ensemble(model, params, y0, t0, tf, n, rtol, atol)
+        return t, list(y)
+    except Exception as error:
+        if len(y0) == 1:
+            return np.linspace(t0, tf, n), [str(error) or type(error).__name__]
+    half = len(y0) // 2
+    t, first = solve_members(model, {name: values[:half] for name, values in params.items()}, y0[:half],
+                             t0, tf, n, rtol, atol)
+    _, second = solve_members(model, {name: values[half:] for name, values in params.items()}, y0[half:],
+                              t0, tf, n, rtol, atol)
+    return t, first + second
+
+
+class SolveService:
+    """
+    Local asyncio service that collects solve requests for a short batching window and solves all
+    requests for the same model and time grid together with solve_ensemble.
+    A request is a dictionary such as
+        {'id': 7, 'model': 'nonlinear1', 'params': {'a': 2, 'b': 0.75}, 'y0': 0, 't0': 0, 'tf': 20, 'n': 101}
+    and its response is {'id': 7, 't': [...], 'y': [...]} or {'id': 7, 'error': '...'}.
+    Over a connection, requests and responses are sent as one JSON object per line, and responses
+    are written as soon as their batch is solved, so they may arrive out of order.
+    A request {'type': 'metrics'} returns the service metrics instead.
+    """
+
+    def __init__(self, window=0.005, max_batch=2048, rtol=1e-6, atol=1e-9):
+        """
+        :param window: seconds to wait for more requests after the first request of a batch
+        :param max_batch: number of requests that closes a batch before the window ends
+        :param rtol: relative tolerance of the ensemble solves
+        :param atol: absolute tolerance of the ensemble solves
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self.rtol = rtol
+        self.atol = atol
+        self._open = {}  # Batches still collecting requests, keyed by model and time grid
+        self._latencies = deque(maxlen=10000)  # Seconds from arrival to response of recent requests
+        self._batch_sizes = deque(maxlen=10000)
+        self._served = 0
+        self._solve_time = 0.0
+        self._started = time.perf_counter()
+        self._server = None
+        self._connections = set()  # Tasks serving the open connections
+
+    async def solve(self, request):
+        """
+        Queues one request and waits for the batch it joins to be solved.
+        :param request: request dictionary (see the class docstring)
+        :return: response dictionary
+        """
+        arrival = time.perf_counter()
+        try:
+            key, params, y0 = self._validate(request)
+        except ValueError as error:
+            return {'id': request.get('id'), 'error': f'invalid request: {error}'}
+
+        batch = self._open.get(key)
+        if batch is None:
+            batch = self._open[key] = []
+            asyncio.get_running_loop().create_task(self._close_after_window(key, batch))
+        future = asyncio.get_running_loop().create_future()
+        batch.append((request, params, y0, future))
+        if len(batch) >= self.max_batch:
+            self._close(key, batch)
+
+        response = await future
+        self._latencies.append(time.perf_counter() - arrival)
+        self._served += 1
+        return response
+
+    @staticmethod
+    def _validate(request):
+        """
+        Checks one request before it joins a batch, so a bad request is rejected on its own instead
+        of failing the ensemble solve of every request batched with it.
+        :param request: request dictionary (see the class docstring)
+        :return: the batch key (model, t0, tf, n), the parameter values in call order and y0
+        """
+        def number(value, name):
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not np.isfinite(value):
+                raise ValueError(f"{name} must be a finite number, got {value!r}")
+            return float(value)
+
+        model = request.get('model')
+        if model not in MODELS:
+            raise ValueError(f"unknown model {model!r}")
+        for name in ('t0', 'tf', 'n'):
+            if name not in request:
+                raise ValueError(f"missing {name}")
+        t0, tf, n = number(request['t0'], 't0'), number(request['tf'], 'tf'), number(request['n'], 'n')
+        if n != int(n) or n < 2:
+            raise ValueError(f"n must be an integer of at least 2, got {request['n']!r}")
+        if tf == t0:
+            raise ValueError("tf must differ from t0")
+
+        params = request.get('params')
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        names = MODELS[model][1]
+        missing = [name for name in names if name not in params]
+        if missing:
+            raise ValueError(f"missing parameters {missing} of {model}")
+        values = [number(params[name], f"parameter {name}") for name in names]
+
+        y0 = request.get('y0')
+        if isinstance(y0, list):
+            if len(y0) != 1:
+                raise ValueError(f"y0 must have one component, got {len(y0)}")
+            y0 = y0[0]
+        return (model, t0, tf, int(n)), values, number(y0, 'y0')
+
+    async def _close_after_window(self, key, batch):
+        """Closes a batch once its batching window has passed, unless it was already closed when full."""
+        await asyncio.sleep(self.window)
+        if self._open.get(key) is batch:
+            self._close(key, batch)
+
+    def _close(self, key, batch):
+        """Stops a batch from collecting requests and starts solving it."""
+        del self._open[key]
+        asyncio.get_running_loop().create_task(self._run_batch(key, batch))
+
+    async def _run_batch(self, key, batch):
+        """
+        Solves a closed batch in a worker thread, so new requests keep being collected meanwhile,
+        and resolves the future of every request in it. Members that make the ensemble solve fail
+        are isolated by solve_members, so only they get an error.
+        """
+        model, t0, tf, n = key
+        names = MODELS[model][1]
+        requests = [request for request, _, _, _ in batch]
+        start = time.perf_counter()
+        params = {name: [values[j] for _, values, _, _ in batch] for j, name in enumerate(names)}
+        y0 = [y0 for _, _, y0, _ in batch]
+        t, rows = await asyncio.get_running_loop().run_in_executor(
+            None, solve_members, model, params, y0, t0, tf, n, self.rtol, self.atol)
+        responses = [{'id': request.get('id'), 'error': row} if isinstance(row, str) else
+                     {'id': request.get('id'), 't': t.tolist(), 'y': row.tolist()}
+                     for request, row in zip(requests, rows)]
+        self._solve_time += time.perf_counter() - start
+        self._batch_sizes.append(len(batch))
+
+        for (_, _, _, future), response in zip(batch, responses):
+            future.set_result(response)
+
+    def metrics(self):
+        """
+        Summarises the latency and throughput of the service since it was created.
+        :return: dictionary of metrics
+        """
+        latencies = np.array(self._latencies) if self._latencies else np.zeros(1)
+        elapsed = time.perf_counter() - self._started
+        return {'served': self._served,
+                'batches': len(self._batch_sizes),
+                'mean_batch_size': float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+                'latency_p50': float(np.percentile(latencies, 50)),
+                'latency_p95': float(np.percentile(latencies, 95)),
+                'latency_max': float(latencies.max()),
+                'solve_time': self._solve_time,
+                'throughput': self._served / elapsed}
+
+    async def _respond(self, line, writer):
+        """Answers one request line on a connection. Every line gets a response, errors included."""
+        request = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+            response = self.metrics() if request.get('type') == 'metrics' else await self.solve(request)
+        except ValueError as error:
+            response = {'id': request.get('id') if isinstance(request, dict) else None,
+                        'error': f'invalid request: {error}'}
+        except Exception as error:
+            response = {'id': request.get('id') if isinstance(request, dict) else None,
+                        'error': f'{type(error).__name__}: {error}'}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection: every request line is answered independently, so a client can
+        send many requests before reading the responses.
+        """
+        self._connections.add(asyncio.current_task())
+        tasks = []
+        try:
+            while line := await reader.readline():
+                tasks.append(asyncio.create_task(self._respond(line, writer)))
+            await asyncio.gather(*tasks, return_exceptions=True)  # A client that went away loses its replies
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._connections.discard(asyncio.current_task())
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """
+        Starts listening for connections on localhost.
+        """
+        self._server = await asyncio.start_server(self.handle, host, port, limit=2**24)
+
+    async def close(self):
+        """Stops accepting connections and waits for the open ones to finish."""
+        self._server.close()
+        await self._server.wait_closed()
+        await asyncio.gather(*self._connections)
+
+
+async def request_solves(requests, host='127.0.0.1', port=8765):
+    """
+    Sends requests over one connection and collects their responses.
+    :param requests: list of request dictionaries, each with a unique 'id'
+    :return: dictionary mapping each request id to its response (None for lines that were not
+             valid requests)
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=2**24)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+
+    responses = {}
+    for _ in requests:  # One response line per request line
+        response = json.loads(await reader.readline())
+        responses[response.get('id')] = response
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+async def demo(n_requests=1000, n_clients=10):
+    """
+    Sends a burst of R1.1 requests to a local service from several clients and compares the
+    time taken against solving each request on its own.
+    """
+    rng = np.random.default_rng(0)
+    requests = [{'id': i, 'model': 'nonlinear1',
+                 'params': {'a': float(rng.uniform(0.5, 2)), 'b': float(rng.uniform(0.5, 3.5))},
+                 'y0': 0, 't0': 0, 'tf': 20, 'n': 101} for i in range(n_requests)]
+
+    # One solve_ivp call per request, as solve_ode in R1.1 does
+    start = time.perf_counter()
+    for request in requests:
+        solve_ensemble(request['model'], request['params'], [request['y0']],
+                       request['t0'], request['tf'], request['n'], rtol=1e-3, atol=1e-6)
+    print(f"{n_requests} separate solves: {time.perf_counter() - start:.2f} s")
+
+    service = SolveService()
+    await service.serve()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(request_solves(requests[i::n_clients]) for i in range(n_clients)))
+    print(f"{n_requests} requests through the service: {time.perf_counter() - start:.2f} s")
+    print(f"Answered {sum(len(r) for r in results)} requests")
+
+    # Bad requests are rejected on their own, and a diverging request fails alone, so the valid
+    # requests batched with them are still solved
+    good = {'model': 'nonlinear1', 'params': {'a': 1, 'b': 1}, 'y0': 0, 't0': 0, 'tf': 20, 'n': 101}
+    mixed = requests[:3] + [dict(good, id='no b', params={'a': 1}),
+                            dict(good, id='bad tf', tf='later'),
+                            dict(good, id='diverges', params={'a': -1, 'b': 1}, y0=1),
+                            {key: value for key, value in dict(good, id='no t0').items() if key != 't0'}]
+    for request_id, response in (await request_solves(mixed)).items():
+        print(f"Request {request_id!r}: {response.get('error', 'solved')}")
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', 8765)
+    writer.write(json.dumps({'type': 'metrics'}).encode() + b'\n')
+    print("Metrics:", json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+
+    await service.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(demo())
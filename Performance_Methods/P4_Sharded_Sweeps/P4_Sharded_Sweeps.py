@@ -0,0 +1,364 @@
+import os
+import json
+import shutil
+import hashlib
+import time
+import socket
+import asyncio
+import itertools
+import multiprocessing
+from collections import deque
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy import integrate
+from google.colab import files
+
+PARAMS = ['b', 'omega0', 'A', 'omega']  # Parameters of driven_pendulum, in call order
+
+
+def driven_pendulum(t, y, b, omega0, A, omega):
+    """
+    Derivatives of many driven harmonic oscillators (experiment R1.6) solved as one system.
+    The damped oscillator of experiment R1.4 is the case A = 0.
+    :param t: time
+    :param y: flat array [x_1, ..., x_m, v_1, ..., v_m]
+    :param b: array of damping constants
+    :param omega0: array of natural frequencies
+    :param A: array of driving amplitudes
+    :param omega: array of driving frequencies
+    :return: flat array of the derivatives [dx/dt, dv/dt]
+    """
+    x, v = y.reshape(2, -1)
+    dxdt = v
+    dvdt = -b * v - (omega0 ** 2) * x - A * np.sin(omega * t)
+    return np.concatenate([dxdt, dvdt])
+
+
+def sweep_grid(**values):
+    """
+    Builds every combination of the given parameter values.
+    :param values: parameter name = list of values, for every name in PARAMS
+    :return: list of parameter lists in PARAMS order
+    """
+    return [list(point) for point in itertools.product(*(values[name] for name in PARAMS))]
+
+
+def shard_identity(points, tf, n, y0, segment):
+    """
+    Fingerprint of everything that determines the result of a shard, stored in its checkpoint so
+    that a checkpoint left by a different sweep is never resumed.
+    :return: hex digest of the shard points and the sweep settings
+    """
+    settings = {'points': points, 'tf': tf, 'n': n, 'y0': list(y0), 'segment': segment}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def integrate_shard(points, tf, n, y0, segment, checkpoint, fail_after=None):
+    """
+    Solves every point of a shard together, in segments of length segment. After each segment the
+    state and the output so far are saved to the checkpoint file, and a later call with the same
+    checkpoint continues from the last saved segment. The segments are always the same, so a
+    resumed run gives exactly the same numbers as an uninterrupted one. A checkpoint written for
+    different points or settings is deleted and the shard starts from the beginning.
+    :param points: list of parameter lists in PARAMS order
+    :param tf: final time
+    :param n: number of output time points between 0 and tf
+    :param y0: initial state (x0, v0) shared by every point
+    :param segment: length of time integrated between checkpoints
+    :param checkpoint: path of the checkpoint file
+    :param fail_after: stop the process after this many segments (to simulate a failing node)
+    :return: t (output times), y (array with shape (points, 2, n))
+    """
+    args = np.array(points, dtype=float).T
+    m = len(points)
+    t_eval = np.linspace(0, tf, n)
+    bounds = np.append(np.arange(0, tf, segment), tf)  # Segment boundaries
+
+    identity = shard_identity(points, tf, n, y0, segment)
+
+    first, state, outputs = 0, np.repeat(np.asarray(y0, dtype=float), m), np.full((2 * m, n), np.nan)
+    if os.path.exists(checkpoint):
+        with np.load(checkpoint) as data:
+            stale = 'identity' not in data or str(data['identity']) != identity
+            if not stale:
+                first, state, outputs = int(data['segment']), data['state'], data['outputs']
+        if stale:
+            os.remove(checkpoint)  # Left by another sweep
+
+    for k in range(first, len(bounds) - 1):
+        t0, t1 = bounds[k], bounds[k + 1]
+        last = k == len(bounds) - 2
+        mask = (t_eval >= t0) & ((t_eval < t1) | last)
+
+        # Also evaluate at the end of the segment, which is where the next one starts
+        times = np.union1d(t_eval[mask], [t1])
+        result = integrate.solve_ivp(fun=lambda t, y: driven_pendulum(t, y, *args),
+                                     t_span=(t0, t1),
+                                     y0=state,
+                                     method="RK45",
+                                     t_eval=times,
+                                     rtol=1e-8,
+                                     atol=1e-10)
+        outputs[:, mask] = result.y[:, :mask.sum()]
+        state = result.y[:, -1]
+
+        tmp = checkpoint + '.tmp.npz'
+        np.savez(tmp, identity=identity, segment=k + 1, state=state, outputs=outputs)
+        os.replace(tmp, checkpoint)
+
+        if fail_after is not None and k + 1 - first >= fail_after:
+            os._exit(1)  # Simulate the node being evicted mid-integration
+
+    return t_eval, outputs.reshape(2, m, n).transpose(1, 0, 2)
+
+
+def send(stream, message):
+    """Writes one JSON message line to a socket stream."""
+    stream.write(json.dumps(message).encode() + b'\n')
+    stream.flush()
+
+
+def run_worker(host, port, checkpoint_dir, fail_after=None):
+    """
+    Connects to a coordinator and solves shards until the sweep is finished or the coordinator goes away.
+    :param host: coordinator address
+    :param port: coordinator port
+    :param checkpoint_dir: directory for the checkpoints of partly solved shards
+    :param fail_after: stop the process after this many segments (to simulate a failing node)
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    delivered = None  # Checkpoint of the last shard sent back, removed once the coordinator answers
+    try:
+        with socket.create_connection((host, port)) as sock:
+            stream = sock.makefile('rwb')
+            send(stream, {'type': 'ready'})
+            while line := stream.readline():
+                message = json.loads(line)
+                if delivered is not None:
+                    os.remove(delivered)  # The coordinator has stored the last result
+                    delivered = None
+                if message['type'] == 'done':
+                    return
+                if message['type'] == 'wait':
+                    time.sleep(0.1)  # Every remaining shard is assigned, ask again later
+                    send(stream, {'type': 'ready'})
+                    continue
+
+                checkpoint = os.path.join(checkpoint_dir, f"shard_{message['shard']:05d}_partial.npz")
+                t, y = integrate_shard(message['points'], message['tf'], message['n'], message['y0'],
+                                       message['segment'], checkpoint, fail_after)
+                send(stream, {'type': 'result', 'shard': message['shard'], 't': t.tolist(), 'y': y.tolist()})
+                delivered = checkpoint
+    except ConnectionError:
+        pass  # The coordinator stopped, the checkpoints are kept for the next run
+
+
+class SweepCoordinator:
+    """
+    Splits a parameter grid into shards and hands them to workers connecting over TCP.
+    Messages are JSON objects, one per line:
+        worker: {'type': 'ready'} or {'type': 'result', 'shard': k, 't': [...], 'y': [...]}
+        coordinator: {'type': 'work', 'shard': k, 'points': [...], ...}, {'type': 'wait'} or {'type': 'done'}
+    Every finished shard is written to directory/shards, so a restarted coordinator only hands out
+    the shards that are still missing. A shard held by a worker whose connection drops is handed
+    out again.
+    """
+
+    def __init__(self, directory, points, shard_size, tf, n, y0, segment):
+        """
+        Opens a sweep directory, creating it for a new sweep.
+        :param directory: directory for the sweep definition and the finished shards
+        :param points: list of parameter lists in PARAMS order
+        :param shard_size: number of points in each shard
+        :param tf: final time
+        :param n: number of output time points
+        :param y0: initial state (x0, v0)
+        :param segment: length of time integrated between worker checkpoints
+        """
+        self.directory = directory
+        self.definition = {'points': points, 'shard_size': shard_size, 'tf': tf, 'n': n,
+                           'y0': list(y0), 'segment': segment}
+        os.makedirs(os.path.join(directory, 'shards'), exist_ok=True)
+
+        path = os.path.join(directory, 'sweep.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                if json.load(f) != self.definition:
+                    raise ValueError(f"{directory} holds a different sweep")
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.definition, f)
+
+        self.shards = [points[i:i + shard_size] for i in range(0, len(points), shard_size)]
+        self._pending = deque(k for k in range(len(self.shards)) if not os.path.exists(self.shard_path(k)))
+        self._assigned = set()
+        self._saved = 0
+        self._stop_after = None
+        self._finished = None
+        self._connections = {}  # Writer of each open worker connection, keyed by its handler task
+
+    def shard_path(self, k):
+        """Path of the file holding the results of shard k."""
+        return os.path.join(self.directory, 'shards', f'shard_{k:05d}.npz')
+
+    def _save(self, message):
+        """Writes a finished shard to disk."""
+        k = message['shard']
+        tmp = self.shard_path(k) + '.tmp.npz'
+        np.savez(tmp, t=np.array(message['t']), y=np.array(message['y']), params=np.array(self.shards[k]))
+        os.replace(tmp, self.shard_path(k))
+        self._assigned.discard(k)
+        self._saved += 1
+        if (not self._pending and not self._assigned) or self._saved == self._stop_after:
+            self._finished.set()
+
+    async def handle(self, reader, writer):
+        """Serves one worker connection."""
+        held = None  # Shard currently assigned to this worker
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if message['type'] == 'result':
+                    self._save(message)
+                    held = None
+
+                if self._pending:
+                    held = self._pending.popleft()
+                    self._assigned.add(held)
+                    reply = dict(self.definition, type='work', shard=held, points=self.shards[held])
+                    del reply['shard_size']
+                elif self._assigned:
+                    reply = {'type': 'wait'}
+                else:
+                    reply = {'type': 'done'}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if held is not None:
+                # The worker went away with its shard, so hand it to another worker
+                self._assigned.discard(held)
+                self._pending.appendleft(held)
+            writer.close()
+            del self._connections[asyncio.current_task()]
+
+    async def run(self, start_workers, host='127.0.0.1', stop_after=None):
+        """
+        Serves workers until every shard is finished.
+        :param start_workers: function called with the port once the coordinator is listening
+        :param host: address to listen on
+        :param stop_after: stop after saving this many shards (to simulate the coordinator stopping)
+        :return: number of shards saved by this run
+        """
+        self._finished = asyncio.Event()
+        self._stop_after = stop_after
+        if not self._pending:
+            return 0
+        server = await asyncio.start_server(self.handle, host, 0, limit=2**26)
+        start_workers(server.sockets[0].getsockname()[1])
+        await self._finished.wait()
+        server.close()
+        await server.wait_closed()
+
+        # Hang up on the workers still connected and let their handlers finish
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections)
+        return self._saved
+
+
+def load_results(directory):
+    """
+    Reads every shard of a finished sweep.
+    :param directory: sweep directory
+    :return: params (array with one row per point, columns in PARAMS order), t, y (array with shape (points, 2, n))
+    """
+    with open(os.path.join(directory, 'sweep.json')) as f:
+        definition = json.load(f)
+    n_shards = -(-len(definition['points']) // definition['shard_size'])
+    params, y = [], []
+    for k in range(n_shards):
+        with np.load(os.path.join(directory, 'shards', f'shard_{k:05d}.npz')) as data:
+            params.append(data['params'])
+            y.append(data['y'])
+            t = data['t']
+    return np.concatenate(params), t, np.concatenate(y)
+
+
+def run_sweep(coordinator, checkpoint_dir, n_workers, fail_after=None, stop_after=None):
+    """
+    Runs a coordinator with local worker processes standing in for nodes.
+    :param coordinator: SweepCoordinator
+    :param checkpoint_dir: checkpoint directory shared by the workers
+    :param n_workers: number of worker processes
+    :param fail_after: make the first worker fail after this many segments
+    :param stop_after: stop the coordinator after this many shards
+    :return: number of shards saved by this run
+    """
+    context = multiprocessing.get_context('spawn')
+    workers = []
+
+    def start_workers(port):
+        for i in range(n_workers):
+            worker = context.Process(target=run_worker,
+                                     args=('127.0.0.1', port, checkpoint_dir, fail_after if i == 0 else None))
+            worker.start()
+            workers.append(worker)
+
+    saved = asyncio.run(coordinator.run(start_workers, stop_after=stop_after))
+    for worker in workers:
+        worker.join(timeout=60)
+        if worker.is_alive():
+            worker.terminate()
+    return saved
+
+
+def main():
+    """
+    Sweeps the driving frequency and damping of the R1.6 oscillator. The first run loses a worker
+    mid-shard and then stops early; the second run resumes it. The result is compared against an
+    uninterrupted run, and the resonance curves are plotted.
+    """
+    points = sweep_grid(b=[0.05, 0.1, 0.2, 0.5], omega0=[1], A=[1.5], omega=np.linspace(0.2, 2.0, 24).tolist())
+    settings = dict(shard_size=8, tf=200, n=2001, y0=(0, 0), segment=50)
+
+    # Start from scratch, otherwise a rerun would only find the finished sweeps of the last run
+    for directory in ('sweep_resumed', 'checkpoints_resumed', 'sweep_reference', 'checkpoints_reference'):
+        shutil.rmtree(directory, ignore_errors=True)
+
+    start = time.perf_counter()
+    saved = run_sweep(SweepCoordinator('sweep_resumed', points, **settings), 'checkpoints_resumed', 3,
+                      fail_after=2, stop_after=5)
+    print(f"First run saved {saved} shards before stopping ({time.perf_counter() - start:.1f} s)")
+    saved = run_sweep(SweepCoordinator('sweep_resumed', points, **settings), 'checkpoints_resumed', 3)
+    print(f"Resumed run saved the remaining {saved} shards ({time.perf_counter() - start:.1f} s in total)")
+
+    start = time.perf_counter()
+    run_sweep(SweepCoordinator('sweep_reference', points, **settings), 'checkpoints_reference', 3)
+    print(f"Uninterrupted run: {time.perf_counter() - start:.1f} s")
+
+    params, t, y = load_results('sweep_resumed')
+    _, _, y_reference = load_results('sweep_reference')
+    print("Resumed sweep identical to uninterrupted sweep:", np.array_equal(y, y_reference))
+
+    # Steady state amplitude: largest displacement over the last quarter of the run
+    amplitude = np.abs(y[:, 0, t >= 0.75 * t[-1]]).max(axis=1)
+    plt.figure()
+    for b in np.unique(params[:, 0]):
+        rows = params[:, 0] == b
+        plt.plot(params[rows, 3], amplitude[rows], '.-', label=f'b = {b}')
+    plt.xlabel(r'Driving frequency $\omega_d$')
+    plt.ylabel('Steady state amplitude')
+    plt.title('Driven Harmonic Oscillator Resonance Curves')
+    plt.legend()
+    filename = 'driven_resonance_sweep.png'
+    plt.savefig(filename, dpi=300)
+    print(f"Saved plot as {filename}")  # Text confirm
+    files.download(filename)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()
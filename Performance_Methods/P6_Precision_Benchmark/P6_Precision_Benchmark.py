@@ -0,0 +1,148 @@
+import time
+import numpy as np
+
+PRECISIONS = ['float64', 'float32', 'float32_kahan']
+
+
+def kahan_add(total, increment, compensation):
+    """Add increment to total with Kahan compensated summation. Returns the new total and compensation."""
+    y = increment - compensation
+    new_total = total + y
+    return new_total, (new_total - total) - y
+
+
+def decay_increments(t, state, h, tau=2.0):
+    """Euler increments for radioactive decay dN/dt = -N / tau (experiment E1.1)."""
+    N, = state
+    return [-(N / N.dtype.type(tau)) * h]
+
+
+def non_linear_increments(t, state, h):
+    """Euler increments for dx/dt = t - x^2 (experiment E1.2)."""
+    x, = state
+    return [h * (t - x * x)]
+
+
+def coupled_increments(t, state, h):
+    """Euler increments for dx/dt = y, dy/dt = -x (experiment E1.3)."""
+    x, y = state
+    return [h * y, -(h * x)]
+
+
+def modified_euler_increments(t, state, h):
+    """Modified Euler (Heun) increments for the simple harmonic oscillator (experiment E1.4)."""
+    x, v = state
+    xinit = x + h * v
+    vinit = v - h * x
+    half = x.dtype.type(0.5)
+    return [half * h * (v + vinit), -(half * h * (x + xinit))]
+
+
+def run_ensemble(increments, state0, h, n_steps, precision, accumulate_time=False):
+    """
+    Steps an ensemble of initial conditions with every state component stored in the requested
+    precision. Step k is taken at t = k h rounded once to that precision, as in E1.2, or with
+    accumulate_time at t advanced by t = t + h every step, as in E1.1.
+    :param increments: function (t, state, h) returning the list of increments of the state components
+    :param state0: list of arrays, the initial value of each state component for every member
+    :param h: step size
+    :param n_steps: number of steps
+    :param precision: 'float64' (reference), 'float32', or 'float32_kahan' for float32 with
+                      compensated state updates (and compensated time updates with accumulate_time)
+    :param accumulate_time: advance the time by repeated addition, so it drifts in float32
+    :return: list of arrays with the final state, and the final time
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown precision {precision!r}")
+    dtype = np.float64 if precision == 'float64' else np.float32
+    state = [np.asarray(s, dtype=dtype) for s in state0]
+    compensation = [np.zeros_like(s) for s in state]
+    t_values = (np.arange(n_steps + 1) * np.float64(h)).astype(dtype)
+    h = dtype(h)
+    t = ct = dtype(0)
+
+    for k in range(n_steps):
+        if not accumulate_time:
+            t = t_values[k]
+        steps = increments(t, state, h)
+        if precision == 'float32_kahan':
+            for i, step in enumerate(steps):
+                state[i], compensation[i] = kahan_add(state[i], step.astype(dtype, copy=False), compensation[i])
+        else:
+            state = [s + step.astype(dtype, copy=False) for s, step in zip(state, steps)]
+        if accumulate_time:
+            if precision == 'float32_kahan':
+                t, ct = kahan_add(t, h, ct)
+            else:
+                t = t + h
+    return state, t if accumulate_time else t_values[n_steps]
+
+
+def check_increments(h=0.001, n_steps=2000):
+    """
+    Checks the float64 increments of every experiment against the exact solution of its equation
+    (E1.2, which has none, against a run with a ten times smaller step), within the global error
+    of the method, so a wrong sign or factor in an increment stops the benchmark.
+    Raises RuntimeError naming the experiments that are off.
+    """
+    t = h * n_steps
+    (N,), _ = run_ensemble(decay_increments, [[10.0]], h, n_steps, 'float64')
+    (x2,), _ = run_ensemble(non_linear_increments, [[1.0]], h, n_steps, 'float64')
+    (x2_fine,), _ = run_ensemble(non_linear_increments, [[1.0]], h / 10, 10 * n_steps, 'float64')
+    (x3, y3), _ = run_ensemble(coupled_increments, [[0.0], [1.0]], h, n_steps, 'float64')
+    (x4, v4), _ = run_ensemble(modified_euler_increments, [[0.0], [1.0]], h, n_steps, 'float64')
+
+    # Error of each final state and the bound on it: Euler is first order, modified Euler second order
+    checks = {'E1.1': (abs(N[0] - 10 * np.exp(-t / 2.0)), 10 * h),
+              'E1.2': (abs(x2[0] - x2_fine[0]), 10 * h),
+              'E1.3': (max(abs(x3[0] - np.sin(t)), abs(y3[0] - np.cos(t))), 10 * h),
+              'E1.4': (max(abs(x4[0] - np.sin(t)), abs(v4[0] - np.cos(t))), 10 * h**2)}
+    failed = [f'{name} (error {error:.1e} > {bound:.1e})' for name, (error, bound) in checks.items()
+              if not error <= bound]  # Also catches nan
+    if failed:
+        raise RuntimeError(f"increments do not solve their equations: {', '.join(failed)}")
+
+
+def benchmark(name, increments, state0, h, n_steps, accumulate_time=False):
+    """
+    Runs one experiment in every precision and prints the throughput against the float64 reference
+    together with the largest error of the final state relative to the reference, and with
+    accumulate_time the error of the final time.
+    """
+    members = len(state0[0])
+    reference = None
+    print(f"{name}: {members} members, {n_steps} steps of h = {h}"
+          + (", time advanced by t = t + h" if accumulate_time else ""))
+    for precision in PRECISIONS:
+        start = time.perf_counter()
+        state, t = run_ensemble(increments, state0, h, n_steps, precision, accumulate_time)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference, reference_time = state, elapsed
+        error = max(np.abs(s.astype(np.float64) - r).max() / np.abs(r).max() for s, r in zip(state, reference))
+        time_error = f", time error {abs(float(t) - n_steps * h):.1e}" if accumulate_time else ""
+        print(f"    {precision:>14}: {members * n_steps / elapsed / 1e6:7.1f} M member-steps/s "
+              f"({reference_time / elapsed:4.2f}x), relative error {error:.1e}{time_error}")
+
+
+def main():
+    """
+    Compares float64, float32 and compensated float32 stepping for ensembles of each Euler experiment.
+    """
+    check_increments()
+
+    members = 100000
+    rng = np.random.default_rng(0)
+
+    benchmark('E1.1 radioactive decay', decay_increments,
+              [rng.uniform(5, 15, members)], h=0.001, n_steps=10000, accumulate_time=True)
+    benchmark('E1.2 dx/dt = t - x^2', non_linear_increments,
+              [rng.uniform(0, 4, members)], h=0.001, n_steps=10000)
+    benchmark('E1.3 coupled equations', coupled_increments,
+              [rng.uniform(-0.1, 0.1, members), rng.uniform(0.9, 1.1, members)], h=0.001, n_steps=10000)
+    benchmark('E1.4 modified Euler', modified_euler_increments,
+              [rng.uniform(-0.1, 0.1, members), rng.uniform(0.9, 1.1, members)], h=0.001, n_steps=10000)
+
+
+if __name__ == '__main__':
+    main()
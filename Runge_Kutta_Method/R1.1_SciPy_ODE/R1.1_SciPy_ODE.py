@@ -47,14 +47,68 @@ def solve_ode(a, b, t0, tf, n, y0):
 
     return result.t, result.y[0]  # Return time and solution
 
+class ODESolution:
+    """
+    Solution of the ODE that keeps its RK45 solver, including the current step size and the stages
+    used for the next error estimate, so it can be extended to a later final time without solving
+    again from t0. The solver is never told a final time, so its steps do not depend on where the
+    solution was stopped, and extending in several calls gives exactly the values of one long run.
+    """
+
+    def __init__(self, a, b, t0, y0):
+        """
+        :param a: parameter a in the ODE
+        :param b: parameter b in the ODE
+        :param t0: initial time
+        :param y0: initial condition
+        """
+        self.solver = integrate.RK45(fun=lambda t, y: nonlinear1(t, y, a, b),
+                                     t0=t0,
+                                     y0=np.atleast_1d(np.asarray(y0, dtype=float)),
+                                     t_bound=np.inf)  # Step on without ever clipping a step at tf
+        self.ts = [t0]  # Times at the end of each step taken
+        self.interpolants = []  # Dense output of each step taken
+
+    def extend(self, tf):
+        """
+        Continues the integration from where it stopped until it has passed tf.
+        :param tf: new final time
+        :return: the solution itself
+        """
+        while self.solver.t < tf:
+            message = self.solver.step()
+            if self.solver.status == 'failed':
+                raise RuntimeError(message)
+            self.ts.append(self.solver.t)
+            self.interpolants.append(self.solver.dense_output())
+        return self
+
+    def __call__(self, t):
+        """
+        Evaluates the solution at times that have already been reached.
+        :param t: array of time points
+        :return: array of solution values
+        """
+        return integrate.OdeSolution(self.ts, self.interpolants)(t)[0]
+
+    def sample(self, tf, n):
+        """
+        Extends the solution to tf if needed and evaluates it on n evenly spaced points from the
+        initial time, like solve_ode.
+        :return: t (time points), y (solution)
+        """
+        self.extend(tf)
+        t = np.linspace(self.ts[0], tf, n)
+        return t, self(t)
+
 def main():
     """
-    Main function to solve the ODE for different values of a and b, and plot the results on the same graph.
+    Main function to solve the ODE for different values of a and b, and plot the results on the same graph
+    for each final time, extending the solutions instead of solving again from t0.
     """
     # Define the initial variables
     t0 = 0  # Initial time
-    tf = 20  # Final time
-    n = 101  # Number of time steps
+    tf_values = [20, 40]  # Final times, each plot extends the solutions of the previous one
     y0 = np.array([0])  # Initial state at t = 0
 
     # Different values of a and b to iterate over
@@ -64,24 +118,34 @@ def main():
     # Colors for plotting
     colors = ['b', 'g', 'r']
 
-    # Create the plot
-    plt.figure()
-
-    # Solve the ODE for each pair of (a, b)
-    for i, (a, b) in enumerate(zip(a_values, b_values)):
-        t, y = solve_ode(a, b, t0, tf, n, y0)  # Solve the ODE
-        plt.plot(t, y, f'{colors[i]}.', label=f'a={a}, b={b}')  # Plot with different color and label
-
-    # Add labels, title, and legend
-    plt.xlabel('Time (t)')  # Label for x-axis
-    plt.ylabel('y(t)')  # Label for y-axis
-    plt.title('Solution of ODE for Different Values of a and b')  # Title of the plot
-    plt.legend()  # Displaying the legend
-    filename = f'ODE.png'
-    plt.savefig(filename, dpi=300)
-    print(f"Saved plot as {filename}") # Text confirm
-    files.download(filename)
-    plt.show()
+    # One solution per pair of (a, b), kept between plots so a later tf only solves the new steps
+    solutions = {(a, b): ODESolution(a, b, t0, y0) for a, b in zip(a_values, b_values)}
+
+    for tf in tf_values:
+        n = 5 * (tf - t0) + 1  # Number of time steps, 101 for tf = 20
+
+        # Create the plot
+        plt.figure()
+
+        # Solve the ODE for each pair of (a, b)
+        for i, (a, b) in enumerate(zip(a_values, b_values)):
+            steps = len(solutions[(a, b)].ts)
+            t, y = solutions[(a, b)].sample(tf, n)  # Extend the solution to tf
+            _, y_reference = solve_ode(a, b, t0, tf, n, y0)  # Solved again from t0 for comparison
+            print(f"a={a}, b={b}: {len(solutions[(a, b)].ts) - steps} new steps to reach tf={tf}, "
+                  f"differs from solve_ode by up to {np.abs(y - y_reference).max():.1e}")
+            plt.plot(t, y, f'{colors[i]}.', label=f'a={a}, b={b}')  # Plot with different color and label
+
+        # Add labels, title, and legend
+        plt.xlabel('Time (t)')  # Label for x-axis
+        plt.ylabel('y(t)')  # Label for y-axis
+        plt.title(f'Solution of ODE for Different Values of a and b (tf = {tf})')  # Title of the plot
+        plt.legend()  # Displaying the legend
+        filename = f'ODE_tf_{tf}.png'
+        plt.savefig(filename, dpi=300)
+        print(f"Saved plot as {filename}") # Text confirm
+        files.download(filename)
+        plt.show()
 
 
 # Ensure that the main function is called when the script is executed
@@ -0,0 +1,261 @@
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy import integrate
+from google.colab import files
+
+PERIOD = 2 * np.pi  # Period of the forcing b sin(t), and so of the periodic steady state
+RTOL = 1e-8  # Tolerances of the shooting integrations
+ATOL = 1e-10
+
+
+def nonlinear1(t, y, a, b):
+    """
+    Calculates the derivative value for the differential equation given in experiment R1, with parameters a and b.
+    :param t: a float for the time variable
+    :param y: a float for the dependent variable
+    :param a: parameter for the equation
+    :param b: parameter for the equation
+    :return dydt a float for the derivative of the differential equation:
+    """
+    return -a * y**3 + b * np.sin(t)
+
+
+def augmented(t, z, a, b, param):
+    """
+    Derivatives of the solution together with its sensitivities to the initial condition and to one parameter.
+    :param t: time
+    :param z: array [y, dy/dy0, dy/dp]
+    :param a: parameter a
+    :param b: parameter b
+    :param param: name of the parameter p, 'a' or 'b'
+    :return: array of the derivatives of z
+    """
+    y, s, q = z
+    dfdy = -3 * a * y**2  # Derivative of the right hand side with respect to y
+    dfdp = -y**3 if param == 'a' else np.sin(t)  # Derivative of the right hand side with respect to p
+    return np.array([nonlinear1(t, y, a, b), dfdy * s, dfdy * q + dfdp])
+
+
+def shoot(y0, a, b, param):
+    """
+    Integrates one forcing period from y0. A periodic orbit is a root of G(y0, p) = y(2 pi) - y0.
+    :param y0: initial condition
+    :param a: parameter a
+    :param b: parameter b
+    :param param: name of the continuation parameter p, 'a' or 'b'
+    :return: G, dG/dy0, dG/dp, the Floquet multiplier dy(2 pi)/dy0 and the solve_ivp result
+    """
+    result = integrate.solve_ivp(fun=lambda t, z: augmented(t, z, a, b, param),
+                                 t_span=(0, PERIOD),
+                                 y0=[y0, 1, 0],
+                                 method="DOP853",
+                                 rtol=RTOL,
+                                 atol=ATOL,
+                                 dense_output=True)
+    y, s, q = result.y[:, -1]
+    return y - y0, s - 1, q, s, result
+
+
+def find_periodic_orbit(a, b, y0=0.0, tol=1e-8, max_iter=50):
+    """
+    Finds the initial condition of the periodic orbit for fixed parameters with Newton shooting.
+    :param a: parameter a
+    :param b: parameter b
+    :param y0: initial guess
+    :param tol: tolerance on the shooting residual
+    :param max_iter: maximum number of Newton iterations
+    :return: y0 of the periodic orbit and the number of iterations used
+    """
+    for iteration in range(1, max_iter + 1):
+        g, g_y, _, _, _ = shoot(y0, a, b, 'b')
+        if abs(g) < tol:
+            return y0, iteration
+        y0 -= g / g_y
+    raise RuntimeError(f"Newton shooting did not converge for a={a}, b={b}")
+
+
+def continuation(a, b, param, p_end, y0=0.0, ds=0.05, ds_min=1e-5, ds_max=0.5, tol=1e-8, max_points=500):
+    """
+    Follows the periodic orbit as one parameter changes, using pseudo-arclength continuation on
+    (y0, p) so that the curve can be followed around folds. Each point starts from the previous one
+    moved along the tangent of the curve, so the corrector only needs a few Newton iterations.
+    A step that would pass p_end is shortened so the predictor lands on it, and its corrector holds
+    the parameter at p_end, so the last point is the orbit at exactly p_end.
+    :param a: parameter a at the start (also the fixed value when param is 'b')
+    :param b: parameter b at the start (also the fixed value when param is 'a')
+    :param param: name of the continuation parameter, 'a' or 'b'
+    :param p_end: value of the parameter where the continuation stops
+    :param y0: initial guess for the first orbit
+    :param ds: initial arclength step
+    :param ds_min: smallest step before giving up
+    :param ds_max: largest step
+    :param tol: tolerance of the corrector
+    :param max_points: maximum number of points on the curve
+    :return: list of dictionaries with the keys 'p', 'y0', 'multiplier', 'amplitude', 'iterations'
+             and 'event' (None, 'fold', 'stability change' or 'period doubling')
+    """
+    def parameters(p):
+        return (p, b) if param == 'a' else (a, p)
+
+    def point(u, mu, result, iterations, event):
+        y = result.sol(np.linspace(0, PERIOD, 400))[0]
+        return {'p': u[1], 'y0': u[0], 'multiplier': mu, 'amplitude': np.abs(y).max(),
+                'iterations': iterations, 'event': event}
+
+    # First point by plain Newton shooting, then its tangent along the curve G(y0, p) = 0
+    p = a if param == 'a' else b
+    y0, iterations = find_periodic_orbit(*parameters(p), y0, tol)
+    g, g_y, g_p, mu, result = shoot(y0, *parameters(p), param)
+    u = np.array([y0, p])
+    tangent = np.array([-g_p, g_y]) / np.hypot(g_p, g_y)
+    if tangent[1] * (p_end - p) < 0:
+        tangent = -tangent
+    direction = np.sign(p_end - p)
+    points = [point(u, mu, result, iterations, None)]
+
+    while len(points) < max_points and direction * (p_end - u[1]) > 0:
+        # Predictor: step along the tangent, shortened if it would pass p_end
+        last = direction * (u[1] + ds * tangent[1] - p_end) >= 0
+        step = (p_end - u[1]) / tangent[1] if last else ds
+        prediction = u + step * tangent
+        if last:
+            prediction[1] = p_end  # Remove the rounding of the shortened step
+        row = np.array([0.0, 1.0]) if last else tangent
+        v = prediction.copy()
+
+        # Corrector: Newton on G = 0 together with the arclength condition tangent . (v - prediction) = 0,
+        # or with p = p_end on the last step
+        converged = False
+        for iteration in range(1, 9):
+            g, g_y, g_p, mu_new, result = shoot(v[0], *parameters(v[1]), param)
+            h = row @ (v - prediction)
+            if max(abs(g), abs(h)) < tol:
+                converged = True
+                break
+            v -= np.linalg.solve([[g_y, g_p], row], [g, h])
+
+        if not converged:
+            ds = step / 2
+            if ds < ds_min:
+                raise RuntimeError(f"Continuation stopped at {param}={u[1]}: step size below {ds_min}")
+            continue
+
+        new_tangent = np.array([-g_p, g_y]) / np.hypot(g_p, g_y)
+        if new_tangent @ tangent < 0:
+            new_tangent = -new_tangent
+
+        # Flag bifurcations between the previous point and this one
+        event = None
+        if np.sign(new_tangent[1]) != np.sign(tangent[1]):
+            event = 'fold'  # The parameter turned back along the curve
+        elif (mu_new + 1) * (points[-1]['multiplier'] + 1) < 0:
+            event = 'period doubling'  # Multiplier crossed -1
+        elif (abs(mu_new) - 1) * (abs(points[-1]['multiplier']) - 1) < 0:
+            event = 'stability change'  # Multiplier left or entered the unit circle
+
+        u, tangent, mu = v, new_tangent, mu_new
+        points.append(point(u, mu, result, iteration, event))
+        if last:
+            break
+
+        # Take longer steps while the corrector converges quickly
+        if iteration <= 3:
+            ds = min(1.5 * ds, ds_max)
+
+    return points
+
+
+def transient_amplitude(a, b, y0=0.0, periods=30, method="RK45", rtol=1e-3, atol=1e-6):
+    """
+    Finds the steady state amplitude the way R1.1 would, by integrating through the transient.
+    :param a: parameter a
+    :param b: parameter b
+    :param y0: initial condition
+    :param periods: number of forcing periods to integrate
+    :param method: solve_ivp method, RK45 with its default tolerances as in R1.1
+    :param rtol: relative tolerance
+    :param atol: absolute tolerance
+    :return: maximum of |y| over the last period
+    """
+    t = np.linspace((periods - 1) * PERIOD, periods * PERIOD, 400)
+    result = integrate.solve_ivp(fun=lambda t, y: nonlinear1(t, y, a, b),
+                                 t_span=(0, periods * PERIOD),
+                                 y0=[y0],
+                                 method=method,
+                                 t_eval=t,
+                                 rtol=rtol,
+                                 atol=atol)
+    return np.abs(result.y[0]).max()
+
+
+def plot_response(ax, points, param, fixed_label, brute_force):
+    """
+    Plots the amplitude of the periodic orbit along a continuation curve, with flagged bifurcations.
+    :param ax: axes to plot on
+    :param points: output of continuation
+    :param param: name of the continuation parameter
+    :param fixed_label: label of the parameter held fixed
+    :param brute_force: tuple of parameter values and amplitudes found by transient integration
+    """
+    p = [point['p'] for point in points]
+    amplitude = [point['amplitude'] for point in points]
+    ax.plot(p, amplitude, 'b-', label='Continuation')
+    ax.plot(*brute_force, 'r.', label='Transient integration')
+    for point in points:
+        if point['event'] is not None:
+            ax.plot(point['p'], point['amplitude'], 'kx')
+            ax.annotate(point['event'], (point['p'], point['amplitude']))
+    ax.set_title(f'Periodic steady state amplitude ({fixed_label})')
+    ax.set_xlabel(param)
+    ax.set_ylabel('max |y|')
+    ax.legend()
+
+
+def main():
+    """
+    Traces the amplitude of the periodic steady state of R1.1 as b and as a change, and compares the
+    cost against integrating through the transient for every parameter value. The transient
+    integrations are timed both with the R1.1 defaults, which are cheaper per solve but only
+    accurate to about 1e-3, and at the accuracy of the shooting solves, which is the fair comparison.
+    """
+    fig, axs = plt.subplots(1, 2, figsize=(12, 5))
+
+    cases = [('b', 2, 0.25, 4.0, 'a = 2', axs[0]),  # Continuation in b at fixed a
+             ('a', 0.2, 0.75, 3.0, 'b = 0.75', axs[1])]  # Continuation in a at fixed b
+    for param, a, b, p_end, fixed_label, ax in cases:
+        start = time.perf_counter()
+        points = continuation(a, b, param, p_end)
+        continuation_time = time.perf_counter() - start
+        iterations = np.mean([point['iterations'] for point in points[1:]])
+        print(f"Continuation in {param} ({fixed_label}): {len(points)} points in {continuation_time:.2f} s, "
+              f"{iterations:.1f} Newton iterations per point")
+
+        # Same curve from transient integrations at every continuation point, first with the R1.1
+        # defaults, then with the shooting method and tolerances so both reach the same accuracy
+        p_values = [point['p'] for point in points]
+        continuation_amplitudes = np.array([point['amplitude'] for point in points])
+        for label, kwargs in [('R1.1 defaults (RK45, rtol 1e-3)', {}),
+                              (f'matched accuracy (DOP853, rtol {RTOL:.0e})',
+                               {'method': "DOP853", 'rtol': RTOL, 'atol': ATOL})]:
+            start = time.perf_counter()
+            amplitudes = [transient_amplitude(p, b, **kwargs) if param == 'a' else transient_amplitude(a, p, **kwargs)
+                          for p in p_values]
+            elapsed = time.perf_counter() - start
+            difference = np.abs(np.array(amplitudes) - continuation_amplitudes).max()
+            print(f"    Transient integration, {label}: {elapsed:.2f} s "
+                  f"({elapsed / continuation_time:.1f}x the continuation time), "
+                  f"amplitude differs by up to {difference:.1e}")
+
+        plot_response(ax, points, param, fixed_label, (p_values, amplitudes))
+
+    plt.tight_layout()
+    filename = 'continuation_response.png'
+    plt.savefig(filename, dpi=300)
+    print(f"Saved plot as {filename}")  # Text confirm
+    files.download(filename)
+    plt.show()
+
+
+if __name__ == '__main__':
+    main()